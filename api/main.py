@@ -4,7 +4,7 @@ from fastapi import FastAPI
 from starlette.responses import RedirectResponse
 
 from make_us_rich.client import BinanceClient
-from make_us_rich.serving import ModelLoader
+from make_us_rich.serving import ModelLoader, PredictionBatcher
 
 
 app = FastAPI(
@@ -15,6 +15,7 @@ app = FastAPI(
 )
 client = BinanceClient()
 models = ModelLoader()
+batcher = PredictionBatcher(models)
 
 
 @app.get("/", include_in_schema=False)
@@ -49,12 +50,12 @@ async def predict(currency: str, compare: str, token: str = None):
     model_name = f"{currency}_{compare}"
     symbol = "".join(model_name.split("_"))
     data = client.get_five_days_data(symbol)
-    response = models.get_predictions(model_name, data)
+    response = await batcher.predict(model_name, data)
     return {"data": data.to_dict(), "prediction": float(response)}
 
 
 @app.put("/update_models", include_in_schema=True, tags=["serving"])
-async def update_model():
+def update_model():
     """
     Update models endpoint.
     """
@@ -76,7 +77,8 @@ async def check_models_number():
     """
     Check models number endpoint.
     """
-    number_of_running_models = len(models.session_models)
+    running_models = models.get_loaded_models()
+    number_of_running_models = len(running_models)
     if number_of_running_models == 0:
         return {"message": "Warning: No models are running."}
     else:
@@ -84,7 +86,7 @@ async def check_models_number():
             "message": f"Number of running models: {number_of_running_models}",
             "models": [],
         }
-        for model in models.session_models:
+        for model in running_models:
             response["models"].append(model)
         return response
 
@@ -1,5 +1,7 @@
 from minio import Minio
+from minio.datatypes import Object
 from os import getenv
+from typing import Iterator
 
 from make_us_rich.utils import load_env
 
@@ -75,3 +77,67 @@ class MinioClient:
         self.client.fget_object(
             bucket_name=bucket, object_name=object_name, file_path=file_path
         )
+
+
+    def stat(self, bucket: str, object_name: str) -> Object:
+        """
+        Gets the metadata of an object stored in Minio.
+
+        Parameters
+        ----------
+        bucket: str
+            Bucket name.
+        object_name: str
+            Object name.
+
+        Returns
+        -------
+        Object
+            Object metadata, including its etag and size.
+        """
+        return self.client.stat_object(bucket_name=bucket, object_name=object_name)
+
+
+    def list_objects(self, bucket: str, prefix: str = None, recursive: bool = False) -> Iterator[Object]:
+        """
+        Lists the objects stored in a Minio bucket.
+
+        Parameters
+        ----------
+        bucket: str
+            Bucket name.
+        prefix: str
+            Only list objects whose name starts with this prefix.
+        recursive: bool
+            Whether to list objects recursively instead of stopping at the first directory level.
+
+        Returns
+        -------
+        Iterator[Object]
+            Iterator over the objects metadata.
+        """
+        return self.client.list_objects(bucket_name=bucket, prefix=prefix, recursive=recursive)
+
+
+    def download_bytes(self, bucket: str, object_name: str) -> bytes:
+        """
+        Downloads an object from Minio directly into memory.
+
+        Parameters
+        ----------
+        bucket: str
+            Bucket name.
+        object_name: str
+            Object name.
+
+        Returns
+        -------
+        bytes
+            Content of the object.
+        """
+        response = self.client.get_object(bucket_name=bucket, object_name=object_name)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
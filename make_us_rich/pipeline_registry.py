@@ -1,4 +1,5 @@
 """Project pipelines."""
+from functools import lru_cache
 from typing import Dict
 
 from kedro.pipeline import Pipeline
@@ -10,9 +11,13 @@ from make_us_rich.pipelines import converting as cto
 from make_us_rich.pipelines import exporting as uf
 
 
+@lru_cache(maxsize=1)
 def register_pipelines() -> Dict[str, Pipeline]:
     """Register the project's pipelines.
 
+    Independent nodes, such as ``validating_model_node`` and ``testing_model_node``, can run
+    concurrently with ``kedro run --runner=ThreadRunner``.
+
     Returns:
         A mapping from a pipeline name to a ``Pipeline`` object.
     """
@@ -21,8 +26,15 @@ def register_pipelines() -> Dict[str, Pipeline]:
     training_pipeline = tm.create_pipeline()
     converting_pipeline = cto.create_pipeline()
     uploading_files_pipeline = uf.create_pipeline()
+    default_pipeline = Pipeline(
+        fetching_pipeline.nodes 
+        + preprocessing_pipeline.nodes 
+        + training_pipeline.nodes 
+        + converting_pipeline.nodes 
+        + uploading_files_pipeline.nodes
+    )
     return {
-        "__default__": fetching_pipeline + preprocessing_pipeline + training_pipeline + converting_pipeline + uploading_files_pipeline,
+        "__default__": default_pipeline,
         "fetching": fetching_pipeline,
         "preprocessing": preprocessing_pipeline,
         "training": training_pipeline,
@@ -1,6 +1,7 @@
 from .pipeline import create_pipeline
 from .nodes import (
     convert_model,
+    test_model,
     to_numpy,
     validate_model,
 )
@@ -8,6 +9,7 @@ from .nodes import (
 __all__ = [
     "create_pipeline",
     "convert_model",
+    "test_model",
     "to_numpy",
     "validate_model",
 ]
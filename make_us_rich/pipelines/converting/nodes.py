@@ -1,10 +1,14 @@
 import glob
+import json
 import numpy as np
 import onnx
 import onnxruntime
 import pandas as pd
 import torch
 
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+from make_us_rich.pipelines.training import CryptoDataset
 from make_us_rich.pipelines.training import PricePredictor
 from make_us_rich.pipelines.training import LSTMDataLoader
 
@@ -51,6 +55,8 @@ def convert_model(
             test_sequences=test_sequences, 
             train_batch_size=parameters["batch_size"], 
             val_batch_size=parameters["batch_size"],
+            train_workers=0,
+            pin_memory=False,
         )
         data.setup()
         input_batch = next(iter(data.train_dataloader()))
@@ -67,6 +73,19 @@ def convert_model(
                 "output": {0: "batch_size"},
             },
         )
+        with open(f"{dir_path}/meta.json", "w") as file:
+            json.dump({
+                "input_name": "sequence",
+                "input_shape": ["batch_size", *input_sample.shape[1:]],
+                "input_dtype": "float32",
+                "output_name": "output",
+            }, file)
+        path_quantized_model = f"{dir_path}/model.int8.onnx"
+        quantize_dynamic(
+            path_onnx_model, path_quantized_model,
+            weight_type=QuantType.QInt8,
+            op_types_to_quantize=["LSTM", "MatMul", "Gemm"],
+        )
     return {
         "conversion_done": True,
         "model_path": model_path,
@@ -87,15 +106,18 @@ def to_numpy(tensor: torch.Tensor):
     -------
     numpy.ndarray
     """
-    return tensor.detach().cpu().numpy() if tensor.requires_grad else tensor.cpu().numpy()
+    tensor = tensor.detach()
+    return tensor.numpy() if tensor.device.type == "cpu" else tensor.cpu().numpy()
 
 
 def validate_model(
     dir_path: str, 
     conversion_outputs: Dict[str, Any],
+    test_sequences: List[Tuple[pd.DataFrame, float]],
+    loss_margin: float = 0.1,
 ) -> Dict[str, bool]:
     """
-    Check if the converted model is valid.
+    Check if the converted model is valid and if the quantized model is as accurate as it.
 
     Parameters
     ----------
@@ -103,6 +125,10 @@ def validate_model(
         Directory path where the model is saved.
     conversion_outputs: Dict[str, Any]
         Dictionary of outputs from the conversion step.
+    test_sequences: List[Tuple[pd.DataFrame, float]]
+        Test sequences used to compare the quantized model with the FP32 one.
+    loss_margin: float
+        Maximum relative increase of the test loss allowed for the quantized model.
     
     Returns
     -------
@@ -127,7 +153,72 @@ def validate_model(
             ort_inputs = {ort_session.get_inputs()[0].name: to_numpy(input_sample)}
             ort_outputs = ort_session.run(None, ort_inputs)
             np.testing.assert_allclose(to_numpy(torch_output), ort_outputs[0], rtol=1e-03, atol=1e-05)
+            fp32_loss, quantized_loss = _compute_test_losses(dir_path, test_sequences)
+            if quantized_loss > fp32_loss * (1 + loss_margin):
+                raise ValueError(
+                    f"quantized model test loss {quantized_loss} exceeds FP32 test loss {fp32_loss} "
+                    f"by more than {loss_margin:.0%}"
+                )
             print("🎉 ONNX model is valid. 🎉")
         except Exception as e:
             raise ValueError(f"ONNX model is not valid: {e}")
         return {"validation_done": True}
+
+
+def test_model(
+    dir_path: str,
+    conversion_outputs: Dict[str, Any],
+    test_sequences: List[Tuple[pd.DataFrame, float]],
+) -> Dict[str, Any]:
+    """
+    Evaluate the FP32 and the quantized models, the latter being the one served, on the test 
+    sequences.
+
+    Parameters
+    ----------
+    dir_path: str
+        Directory path where the model is saved.
+    conversion_outputs: Dict[str, Any]
+        Dictionary of outputs from the conversion step.
+    test_sequences: List[Tuple[pd.DataFrame, float]]
+        Test sequences.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Flag indicating if the test is done and the mean squared errors of the quantized and 
+        FP32 models on the test sequences.
+    """
+    if conversion_outputs["conversion_done"] == True:
+        fp32_loss, quantized_loss = _compute_test_losses(dir_path, test_sequences)
+        print(f"ONNX model test loss: {quantized_loss} (FP32: {fp32_loss})")
+        return {"test_done": True, "test_loss": quantized_loss, "fp32_test_loss": fp32_loss}
+    return {"test_done": False, "test_loss": None, "fp32_test_loss": None}
+
+
+def _compute_test_losses(
+    dir_path: str, test_sequences: List[Tuple[pd.DataFrame, float]],
+) -> Tuple[float, float]:
+    """
+    Compute the mean squared errors of the FP32 and quantized ONNX models on the test sequences.
+
+    Parameters
+    ----------
+    dir_path: str
+        Directory path where the models are saved.
+    test_sequences: List[Tuple[pd.DataFrame, float]]
+        Test sequences.
+
+    Returns
+    -------
+    Tuple[float, float]
+        Test losses of the FP32 and quantized models.
+    """
+    dataset = CryptoDataset(test_sequences)
+    sequences, labels = to_numpy(dataset.X), to_numpy(dataset.y)
+    losses = []
+    for path in [f"{dir_path}/model.onnx", f"{dir_path}/model.int8.onnx"]:
+        ort_session = onnxruntime.InferenceSession(path)
+        ort_outputs = ort_session.run(None, {ort_session.get_inputs()[0].name: sequences})
+        losses.append(float(np.mean((ort_outputs[0].flatten() - labels) ** 2)))
+    return losses[0], losses[1]
@@ -1,6 +1,6 @@
 from kedro.pipeline import Pipeline, node
 
-from .nodes import convert_model, validate_model
+from .nodes import convert_model, test_model, validate_model
 
 
 def create_pipeline(**kwargs):
@@ -24,9 +24,20 @@ def create_pipeline(**kwargs):
                 inputs=[
                     "params:dir_path",
                     "conversion_outputs",
+                    "test_sequences",
                 ],
                 outputs="validation_done",
                 name="validating_model_node"
             ),
+            node(
+                func=test_model,
+                inputs=[
+                    "params:dir_path",
+                    "conversion_outputs",
+                    "test_sequences",
+                ],
+                outputs="test_done",
+                name="testing_model_node"
+            ),
         ]
     )
@@ -1,7 +1,7 @@
 import os 
 
 from datetime import datetime
-from typing import Dict, Tuple
+from typing import Any, Dict, Tuple
 
 from make_us_rich.client import MinioClient
 
@@ -36,13 +36,17 @@ def upload_files(
         date = datetime.now().strftime("%Y-%m-%d")
         model_path = f"{dir_path}/model.onnx"
         client.upload(client.bucket, f"{date}/{currency}_{compare}/model.onnx", model_path)
-        scaler_path = f"{dir_path}/scaler.pkl"
-        client.upload(client.bucket, f"{date}/{currency}_{compare}/scaler.pkl", scaler_path)
+        quantized_model_path = f"{dir_path}/model.int8.onnx"
+        client.upload(client.bucket, f"{date}/{currency}_{compare}/model.int8.onnx", quantized_model_path)
+        metadata_path = f"{dir_path}/meta.json"
+        client.upload(client.bucket, f"{date}/{currency}_{compare}/meta.json", metadata_path)
+        scaler_path = f"{dir_path}/scaler.npz"
+        client.upload(client.bucket, f"{date}/{currency}_{compare}/scaler.npz", scaler_path)
         return {"upload_done": True}
     return {"upload_done": False}
 
 
-def clean_files(upload: Dict[str, bool]) -> Dict[str, bool]:
+def clean_files(upload: Dict[str, bool], test: Dict[str, Any]) -> Dict[str, bool]:
     """
     Cleans the files generated by the pipeline in data directory.
 
@@ -50,6 +54,9 @@ def clean_files(upload: Dict[str, bool]) -> Dict[str, bool]:
     ----------
     upload: Dict[str, bool]
         Dictionary of outputs from the upload step.
+    test: Dict[str, Any]
+        Dictionary of outputs from the test step, only used to wait for the model files to be 
+        released before removing them.
     
     Returns
     -------
@@ -19,7 +19,7 @@ def create_pipeline(**kwargs):
             ),
             node(
                 func=clean_files,
-                inputs=["upload_done"],
+                inputs=["upload_done", "test_done"],
                 outputs="clean_done",
                 name="cleaning_files_node"
             ),
@@ -1,6 +1,6 @@
+import numpy as np
 import pandas as pd
 
-from pickle import dump
 from typing import List, Tuple
 
 from sklearn.preprocessing import MinMaxScaler
@@ -89,7 +89,13 @@ def scale_data(
         index=test_df.index,
         columns=test_df.columns,
     )
-    dump(scaler, open(f"{dir_path}/scaler.pkl", "wb"))
+    np.savez(
+        f"{dir_path}/scaler.npz",
+        min_=scaler.min_,
+        scale_=scaler.scale_,
+        data_min_=scaler.data_min_,
+        data_max_=scaler.data_max_,
+    )
     return scaled_train_df, scaled_test_df
 
 
@@ -1,4 +1,5 @@
 from .crypto_dataset import CryptoDataset
+from .prefetcher import CUDAPrefetcher
 from .dataloader import LSTMDataLoader
 from .model import LSTMRegressor, PricePredictor
 from .nodes import training_loop
@@ -7,6 +8,7 @@ from .pipeline import create_pipeline
 __all__ = [
     "create_pipeline",
     "CryptoDataset",
+    "CUDAPrefetcher",
     "LSTMDataLoader",
     "LSTMRegressor",
     "PricePredictor",
@@ -1,22 +1,29 @@
+import numpy as np
 import pandas as pd
 import torch
 
-from torch.utils.data import Dataset
+from torch.utils.data import TensorDataset
 from typing import List, Tuple
 
 
-class CryptoDataset(Dataset):
+class CryptoDataset(TensorDataset):
     """
     Dataset class for the LSTM model used by PyTorch Lightning.
     """
     def __init__(self, sequences: List[Tuple[pd.DataFrame, float]]):
-        self.sequences = sequences
+        """
+        Initialize the dataset by stacking all the sequences and labels into two contiguous tensors.
 
-
-    def __len__(self):
-        return len(self.sequences)
-
-
-    def __getitem__(self, index: int):
-        sequence, label = self.sequences[index]
-        return (torch.Tensor(sequence.to_numpy()),torch.tensor(label).float())
+        Parameters
+        ----------
+        sequences: List[Tuple[pd.DataFrame, float]]
+            List of sequences.
+        """
+        if len(sequences) == 0:
+            self.X = torch.empty(0, dtype=torch.float32)
+        else:
+            self.X = torch.from_numpy(
+                np.stack([sequence.to_numpy(dtype=np.float32, copy=False) for sequence, _ in sequences])
+            )
+        self.y = torch.from_numpy(np.array([label for _, label in sequences], dtype=np.float32))
+        super().__init__(self.X, self.y)
@@ -1,10 +1,12 @@
+import os
 import pandas as pd
 import pytorch_lightning as pl
+import torch
 
 from torch.utils.data import DataLoader
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
-from make_us_rich.pipelines.training import CryptoDataset
+from make_us_rich.pipelines.training import CryptoDataset, CUDAPrefetcher
 
 
 class LSTMDataLoader(pl.LightningDataModule):
@@ -17,8 +19,11 @@ class LSTMDataLoader(pl.LightningDataModule):
         test_sequences: List[Tuple[pd.DataFrame, float]],
         train_batch_size: int,
         val_batch_size: int,
-        train_workers: int = 2,
+        train_workers: int = None,
         val_workers: int = 1,
+        pin_memory: bool = True,
+        prefetch_factor: int = 4,
+        persistent_workers: bool = True,
     ):
         """
         Initialize the data loader.
@@ -36,9 +41,15 @@ class LSTMDataLoader(pl.LightningDataModule):
         val_batch_size: int
             Batch size for validation.
         train_workers: int
-            Number of workers for training.
+            Number of workers for training. If None, it is picked based on the number of CPUs.
         val_workers: int
             Number of workers for validation.
+        pin_memory: bool
+            Whether to use page-locked memory for faster host to device copies.
+        prefetch_factor: int
+            Number of batches loaded in advance by each worker.
+        persistent_workers: bool
+            Whether to keep the workers alive between epochs.
         """
         super().__init__()
         self.train_sequences = train_sequences
@@ -46,9 +57,12 @@ class LSTMDataLoader(pl.LightningDataModule):
         self.test_sequences = test_sequences
         self.train_batch_size = train_batch_size
         self.val_batch_size = val_batch_size
-        self.train_workers = train_workers
+        self.train_workers = train_workers if train_workers is not None else self._default_workers()
         self.val_workers = val_workers
         self.test_workers = val_workers
+        self.pin_memory = pin_memory
+        self.prefetch_factor = prefetch_factor
+        self.persistent_workers = persistent_workers
 
 
     def setup(self, stage: str = None) -> None:
@@ -66,13 +80,21 @@ class LSTMDataLoader(pl.LightningDataModule):
 
     
     def train_dataloader(self):
-        """Return the training data loader."""
-        return DataLoader(
+        """
+        Return the training data loader.
+
+        When pinned memory is used and a GPU is available, the loader is wrapped in a 
+        CUDAPrefetcher to overlap the host to device copies with the computation.
+        """
+        loader = DataLoader(
             self.train_dataset, 
             batch_size=self.train_batch_size, 
             shuffle=False,
-            num_workers=self.train_workers
+            **self._loader_kwargs(self.train_workers),
         )
+        if self.pin_memory and torch.cuda.is_available():
+            return CUDAPrefetcher(loader)
+        return loader
 
 
     def val_dataloader(self):
@@ -81,7 +103,7 @@ class LSTMDataLoader(pl.LightningDataModule):
             self.val_dataset, 
             batch_size=self.val_batch_size, 
             shuffle=False,
-            num_workers=self.val_workers
+            **self._loader_kwargs(self.val_workers),
         )
 
 
@@ -91,5 +113,32 @@ class LSTMDataLoader(pl.LightningDataModule):
             self.test_dataset, 
             batch_size=self.val_batch_size, 
             shuffle=False,
-            num_workers=self.test_workers
+            **self._loader_kwargs(self.test_workers),
         )
+
+
+    def _loader_kwargs(self, num_workers: int) -> Dict[str, Any]:
+        """
+        Build the keyword arguments shared by all the data loaders.
+
+        Parameters
+        ----------
+        num_workers: int
+            Number of workers for the data loader.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Keyword arguments for the DataLoader.
+        """
+        kwargs = {"num_workers": num_workers, "pin_memory": self.pin_memory}
+        if num_workers > 0:
+            kwargs["prefetch_factor"] = self.prefetch_factor
+            kwargs["persistent_workers"] = self.persistent_workers
+        return kwargs
+
+
+    @staticmethod
+    def _default_workers() -> int:
+        """Return the number of workers to use based on the available CPUs."""
+        return min(8, max(2, (os.cpu_count() or 1) // 2))
@@ -57,6 +57,7 @@ def training_loop(
         val_batch_size=parameters["val_batch_size"],
         train_workers=parameters["train_workers"],
         val_workers=parameters["val_workers"],
+        pin_memory=parameters["run_on_gpu"],
     )
 
     checkpoint_callback = callbacks.ModelCheckpoint(
@@ -0,0 +1,73 @@
+import torch
+
+from torch.utils.data import DataLoader
+from typing import List
+
+
+class CUDAPrefetcher:
+    """
+    Wrapper around a data loader that copies the next batch to the GPU on a side CUDA stream.
+    """
+    def __init__(self, loader: DataLoader, device: torch.device = None):
+        """
+        Initialize the prefetcher.
+
+        Parameters
+        ----------
+        loader: DataLoader
+            Data loader to wrap. It should use pinned memory for the copies to be asynchronous.
+        device: torch.device
+            Device where the batches are copied. Defaults to the current CUDA device.
+        """
+        self.loader = loader
+        self.device = device if device is not None else torch.device("cuda", torch.cuda.current_device())
+        self.stream = torch.cuda.Stream(device=self.device)
+        self._iterator = None
+        self._next_batch = None
+
+
+    def __len__(self) -> int:
+        return len(self.loader)
+
+
+    def __iter__(self):
+        self._iterator = iter(self.loader)
+        self._preload()
+        return self
+
+
+    def __next__(self) -> List[torch.Tensor]:
+        return self.next()
+
+
+    def next(self) -> List[torch.Tensor]:
+        """
+        Return the prefetched batch and start copying the following one.
+
+        Returns
+        -------
+        List[torch.Tensor]
+            Batch of tensors on the GPU.
+        """
+        current_stream = torch.cuda.current_stream(self.device)
+        current_stream.wait_stream(self.stream)
+        batch = self._next_batch
+        if batch is None:
+            raise StopIteration
+        for tensor in batch:
+            tensor.record_stream(current_stream)
+        self._preload()
+        return batch
+
+
+    def _preload(self) -> None:
+        """
+        Pull the next batch from the loader and copy it to the GPU on the side stream.
+        """
+        try:
+            batch = next(self._iterator)
+        except StopIteration:
+            self._next_batch = None
+            return
+        with torch.cuda.stream(self.stream):
+            self._next_batch = [tensor.to(self.device, non_blocking=True) for tensor in batch]
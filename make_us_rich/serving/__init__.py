@@ -1,7 +1,9 @@
+from .batcher import PredictionBatcher
 from .model import OnnxModel
 from .model_loader import ModelLoader
 
 __all__ = [
     "ModelLoader",
     "OnnxModel",
+    "PredictionBatcher",
 ]
@@ -0,0 +1,120 @@
+import asyncio
+import pandas as pd
+
+from functools import partial
+from typing import Dict, List, Tuple
+
+from .model_loader import ModelLoader
+
+
+class PredictionBatcher:
+    """
+    Collapses concurrent prediction requests for the same model into a single batched run.
+    """
+
+    def __init__(self, loader: ModelLoader, window: float = 0.005):
+        """
+        Initializes the batcher.
+
+        Parameters
+        ----------
+        loader: ModelLoader
+            Loader holding the models used for the predictions.
+        window: float
+            Time in seconds to wait for other requests before running the batch.
+        """
+        self.loader = loader
+        self.window = window
+        self._pending: Dict[str, List[Tuple[pd.DataFrame, asyncio.Future]]] = {}
+
+
+    async def predict(self, model_name: str, sample: pd.DataFrame) -> float:
+        """
+        Queues the sample and waits for its prediction.
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the model.
+        sample: pd.DataFrame
+            Sample to predict.
+        
+        Returns
+        -------
+        float
+            Predicted value.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.get(model_name)
+        if pending is None:
+            pending = self._pending[model_name] = []
+            loop.call_later(self.window, self._flush, model_name)
+        pending.append((sample, future))
+        return await future
+
+
+    def _flush(self, model_name: str) -> None:
+        """
+        Runs the queued samples of a model, batching together the samples of the same length.
+
+        Predictions run in the default executor, so the event loop is never blocked, even when 
+        the model is still being loaded.
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the model.
+        """
+        loop = asyncio.get_running_loop()
+        groups: Dict[int, List[Tuple[pd.DataFrame, asyncio.Future]]] = {}
+        for sample, future in self._pending.pop(model_name, []):
+            groups.setdefault(len(sample), []).append((sample, future))
+        for group in groups.values():
+            samples = [sample for sample, _ in group]
+            futures = [future for _, future in group]
+            predictions = loop.run_in_executor(None, self._predict_group, model_name, samples)
+            predictions.add_done_callback(partial(self._set_results, futures))
+
+
+    def _predict_group(self, model_name: str, samples: List[pd.DataFrame]) -> List[float]:
+        """
+        Predicts samples of the same length, as a single sample or as a batch.
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the model.
+        samples: List[pd.DataFrame]
+            Samples to predict.
+        
+        Returns
+        -------
+        List[float]
+            Predicted values, one per sample.
+        """
+        if len(samples) == 1:
+            return [self.loader.get_predictions(model_name, samples[0])]
+        return list(self.loader.get_predictions_batch(model_name, samples))
+
+
+    @staticmethod
+    def _set_results(futures: List[asyncio.Future], predictions: asyncio.Future) -> None:
+        """
+        Sets the predictions, or the error, on the futures of the queued requests.
+
+        Parameters
+        ----------
+        futures: List[asyncio.Future]
+            Futures waiting for the predictions.
+        predictions: asyncio.Future
+            Future of the predictions of the group.
+        """
+        error = predictions.exception()
+        for index, future in enumerate(futures):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(predictions.result()[index])
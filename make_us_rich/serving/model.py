@@ -1,25 +1,68 @@
+import io
 import numpy as np
 import onnxruntime
 import pandas as pd
-import torch
 
 from pathlib import PosixPath
-from pickle import load
-from sklearn.preprocessing import MinMaxScaler
+from threading import Lock
+from typing import Any, Dict, List, Tuple
 
 from make_us_rich.pipelines.preprocessing import extract_features_from_dataset
-from make_us_rich.pipelines.converting import to_numpy
 
 
-class OnnxModel:
+ONNX_TENSOR_DTYPES = {
+    "tensor(float16)": np.float16,
+    "tensor(float)": np.float32,
+    "tensor(double)": np.float64,
+}
+
 
-    def __init__(self, model_path: PosixPath, scaler_path: PosixPath):
+class OnnxModel:
+    """
+    ONNX model used for serving predictions.
+
+    The IOBinding and the input and output buffers are shared between calls, so predictions are 
+    serialized by a lock to keep the model safe to use from several threads.
+    """
+
+    def __init__(
+        self, 
+        model_path: PosixPath, 
+        scaler_path: PosixPath = None,
+        scaler_bytes: bytes = None,
+        metadata: Dict[str, Any] = None,
+        session_options: onnxruntime.SessionOptions = None,
+        providers: List[str] = None,
+    ):
         self.model_path = model_path
         self.scaler_path = scaler_path
+        self.scaler_bytes = scaler_bytes
         self.model_name = self.model_path.parent.parts[-1]
-        self.model = onnxruntime.InferenceSession(str(model_path))
+        self.model = onnxruntime.InferenceSession(
+            str(model_path), sess_options=session_options, providers=providers
+        )
         self.scaler = self._load_scaler()
-        self.descaler = self._create_descaler()
+        if metadata is not None:
+            self.input_name = metadata["input_name"]
+            self.output_name = metadata["output_name"]
+            self.input_shape = self._get_static_shape(metadata["input_shape"])
+            self.input_dtype = np.dtype(metadata.get("input_dtype", "float32"))
+        else:
+            self.input_name = self.model.get_inputs()[0].name
+            self.output_name = self.model.get_outputs()[0].name
+            self.input_shape = self._get_static_shape(self.model.get_inputs()[0].shape)
+            self.input_dtype = np.dtype(
+                ONNX_TENSOR_DTYPES.get(self.model.get_inputs()[0].type, np.float32)
+            )
+        self.output_shape = self._get_static_shape(self.model.get_outputs()[0].shape)
+        self.output_dtype = np.dtype(
+            ONNX_TENSOR_DTYPES.get(self.model.get_outputs()[0].type, np.float32)
+        )
+        self.device = "cuda" if "CUDAExecutionProvider" in self.model.get_providers() else "cpu"
+        self.io_binding = self.model.io_binding()
+        self._input_buffer = np.empty(self.input_shape, dtype=self.input_dtype)
+        self._output_buffer = None
+        self._lock = Lock()
 
     
     def __repr__(self) -> str:
@@ -40,28 +83,76 @@ class OnnxModel:
         float
             Predicted close price.
         """
-        X = self._preprocessing_sample(sample)
-        inputs = {self.model.get_inputs()[0].name: to_numpy(X)}
-        results = self.model.run(None, inputs)[0][0]
-        return self._descaling_sample(results)
+        with self._lock:
+            X = self._preprocessing_sample(sample)
+            results = self._run(X)[0]
+            return self._descaling_sample(results)
 
 
-    def _create_descaler(self) -> MinMaxScaler:
+    def predict_batch(self, samples: List[pd.DataFrame]) -> np.ndarray:
         """
-        Creates a descaler.
+        Predicts the close prices of several input samples with a single model run.
+
+        Parameters
+        ----------
+        samples: List[pd.DataFrame]
+            Input samples, all of the same length.
 
         Returns
         -------
-        MinMaxScaler
+        numpy.ndarray
+            Predicted close prices of shape (number_of_samples,).
         """
-        descaler = MinMaxScaler()
-        descaler.min_, descaler.scale_ = self.scaler.min_[-1], self.scaler.scale_[-1]
-        return descaler
+        X = np.stack([self._scaling_sample(sample) for sample in samples]).astype(self.input_dtype)
+        with self._lock:
+            results = self._run(X)
+            return self._descaling_sample(results).flatten()
 
-    
-    def _descaling_sample(self, sample) -> None:
+
+    def warmup(self) -> None:
+        """
+        Runs the model once on a dummy input, so kernels and memory arenas are initialized 
+        before the first real prediction.
+        """
+        dummy = np.zeros(self.input_shape, dtype=self.input_dtype)
+        with self._lock:
+            self._run(dummy)
+
+
+    def _run(self, inputs: np.ndarray) -> np.ndarray:
         """
-        Descalings the sample.
+        Runs the model with IOBinding, reusing the output buffer between calls. Only the batch 
+        dimension of the output shape changes from one call to another.
+
+        The caller must hold the model lock, since the binding and the buffers are shared.
+
+        Parameters
+        ----------
+        inputs: numpy.ndarray
+            Input batch of shape (batch_size, sequence_length, number_of_features).
+        
+        Returns
+        -------
+        numpy.ndarray
+            Output of the model of shape (batch_size, *output_shape[1:]).
+        """
+        inputs = np.ascontiguousarray(inputs, dtype=self.input_dtype)
+        output_shape = (inputs.shape[0], *self.output_shape[1:])
+        if self._output_buffer is None or tuple(self._output_buffer.shape()) != output_shape:
+            self._output_buffer = onnxruntime.OrtValue.ortvalue_from_shape_and_type(
+                output_shape, self.output_dtype, self.device
+            )
+            self.io_binding.bind_ortvalue_output(self.output_name, self._output_buffer)
+        self.io_binding.bind_input(
+            self.input_name, "cpu", 0, self.input_dtype, inputs.shape, inputs.ctypes.data
+        )
+        self.model.run_with_iobinding(self.io_binding)
+        return self._output_buffer.numpy()
+
+
+    def _descaling_sample(self, sample: np.ndarray) -> np.ndarray:
+        """
+        Descales the sample, using the scaling parameters of the target column.
 
         Parameters
         ----------
@@ -70,29 +161,56 @@ class OnnxModel:
         
         Returns
         -------
-        float
+        numpy.ndarray
             Descaled sample.
         """
-        values_2d = np.array(sample)[:, np.newaxis]
-        return self.descaler.inverse_transform(values_2d).flatten()
+        return (np.asarray(sample) - self.scaler["min_"][-1]) / self.scaler["scale_"][-1]
 
 
-    def _load_scaler(self) -> MinMaxScaler:
+    @staticmethod
+    def _get_static_shape(shape: List[Any]) -> Tuple[int, ...]:
         """
-        Loads the scaler from the model files.
+        Gets a static shape from a model input or output shape, dynamic dimensions being set to 1.
+
+        Parameters
+        ----------
+        shape: List[Any]
+            Model shape, where dynamic dimensions are named by a string or None.
 
         Returns
         -------
-        MinMaxScaler
+        Tuple[int, ...]
+            Static shape.
         """
-        with open(self.scaler_path, "rb") as file:
-            return load(file)
+        return tuple(dim if isinstance(dim, int) else 1 for dim in shape)
 
-    
-    def _preprocessing_sample(self, sample: pd.DataFrame) -> torch.tensor:
+
+    def _load_scaler(self) -> Dict[str, np.ndarray]:
+        """
+        Loads the scaling parameters from the scaler bytes if given, from the scaler file otherwise.
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            MinMaxScaler parameters: `min_`, `scale_`, `data_min_` and `data_max_`.
+        """
+        if self.scaler_bytes is not None:
+            source = io.BytesIO(self.scaler_bytes)
+        elif self.scaler_path is not None:
+            source = self.scaler_path
+        else:
+            raise ValueError("Either scaler_path or scaler_bytes must be provided.")
+        with np.load(source) as scaler:
+            return {key: scaler[key] for key in scaler.files}
+
+
+    def _preprocessing_sample(self, sample: pd.DataFrame) -> np.ndarray:
         """
         Preprocesses the input sample.
 
+        The scaled sample is copied into a reusable input buffer when it matches the model input 
+        shape, so no new array is allocated for the model input.
+
         Parameters
         ----------
         sample: pd.DataFrame
@@ -100,11 +218,29 @@ class OnnxModel:
         
         Returns
         -------
-        torch.tensor
-            Preprocessed sample.
+        numpy.ndarray
+            Preprocessed sample of shape (1, sequence_length, number_of_features).
+        """
+        scaled_data = self._scaling_sample(sample)
+        if scaled_data.shape != self._input_buffer.shape[1:]:
+            return scaled_data[np.newaxis].astype(self.input_dtype)
+        self._input_buffer[0] = scaled_data
+        return self._input_buffer
+
+
+    def _scaling_sample(self, sample: pd.DataFrame) -> np.ndarray:
+        """
+        Extracts the features of the input sample and scales them.
+
+        Parameters
+        ----------
+        sample: pd.DataFrame
+            Input sample.
+        
+        Returns
+        -------
+        numpy.ndarray
+            Scaled features of shape (sequence_length, number_of_features).
         """
         data = extract_features_from_dataset(sample)
-        scaled_data = pd.DataFrame(
-            self.scaler.transform(data), index=data.index, columns=data.columns
-        )
-        return torch.Tensor(scaled_data.values).unsqueeze(0)
+        return data.to_numpy() * self.scaler["scale_"] + self.scaler["min_"]
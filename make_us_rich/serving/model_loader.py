@@ -1,24 +1,70 @@
+import io
+import json
+import logging
+import numpy as np
+import onnxruntime
+import os
 import pandas as pd
+import pickle
+import time
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
-from typing import List
+from minio.error import S3Error
+from pathlib import Path, PosixPath
+from threading import Event, Lock, Thread
+from typing import Any, Dict, FrozenSet, List, Tuple
 
 from .model import OnnxModel
 from make_us_rich.client import MinioClient
 
 
+logger = logging.getLogger(__name__)
+
+
 class ModelLoader:
     """
     Loader class for interacting with the Minio Object Storage API.
     """
 
-    def __init__(self):
+    available_models_ttl = 60
+
+    def __init__(
+        self, quantized: bool = True, max_workers: int = 8, refresh_interval: float = 600,
+    ):
+        """
+        Initializes the loader and starts loading all the models available for the current date.
+
+        Models are loaded in background threads, so the loader is ready immediately. A daemon 
+        thread checks every `refresh_interval` seconds for new models and loads them.
+
+        Parameters
+        ----------
+        quantized: bool
+            Whether to serve the INT8 quantized models instead of the FP32 ones.
+        max_workers: int
+            Maximum number of models loaded concurrently.
+        refresh_interval: float
+            Time in seconds between two checks for new models.
+        """
+        self.model_file_name = "model.int8.onnx" if quantized else "model.onnx"
         self.client = MinioClient()
         self.session_models = {}
         self.storage_path = Path.cwd().joinpath("api", "models")
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self._models_files_paths = {}
+        self.cache_path = self.storage_path.joinpath(".cache.json")
+        self.files_cache = self._load_files_cache()
+        self._cache_lock = Lock()
+        self._available_models_cache = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._session_lock = Lock()
+        self._stop_refresh = Event()
+        self.refresh_interval = refresh_interval
         self.update_date()
-        self.update_model_files()
+        self.update_model_files(wait_for_models=False)
+        self._refresh_thread = Thread(target=self._refresh_models, daemon=True)
+        self._refresh_thread.start()
 
 
     def get_predictions(self, model_name: str, sample: pd.DataFrame) -> float:
@@ -37,33 +83,139 @@ class ModelLoader:
         float
             Predicted value.
         """
-        if self._check_model_exists_in_session(model_name):
-            model = self.session_models[model_name]["model"]
-            return model.predict(sample)
-        else:
-            raise ValueError("Model not found in session.")
+        return self._get_session_model(model_name).predict(sample)
+
+
+    def get_predictions_batch(self, model_name: str, samples: List[pd.DataFrame]) -> np.ndarray:
+        """
+        Gets the predictions from the model for several samples with a single model run.
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the model.
+        samples: List[pd.DataFrame]
+            Samples to predict, all of the same length.
+        
+        Returns
+        -------
+        numpy.ndarray
+            Predicted values, one per sample.
+        """
+        return self._get_session_model(model_name).predict_batch(samples)
 
 
     def update_date(self):
         """
         Updates the date of the loader.
         """
-        self.date = datetime.now().strftime("%Y-%m-%d")
+        date = datetime.now().strftime("%Y-%m-%d")
+        if getattr(self, "date", None) != date:
+            self._available_models_cache.clear()
+        self.date = date
 
 
-    def update_model_files(self):
+    def update_model_files(self, wait_for_models: bool = True):
         """
         Updates the model files in the serving models directory.
+
+        Models are downloaded and added to the session concurrently. Already loaded models keep 
+        serving predictions until their new version is loaded.
+
+        Parameters
+        ----------
+        wait_for_models: bool
+            Whether to wait for all the models to be loaded before returning. If True, the error 
+            of the first model that failed to load is raised.
+        """
+        futures = [
+            self._submit_model_loading(model) 
+            for model in self._get_list_of_available_models(force=True)
+        ]
+        if wait_for_models:
+            for future in futures:
+                future.result()
+
+
+    def get_loaded_models(self) -> List[str]:
+        """
+        Returns the names of the models ready to serve predictions.
+
+        Returns
+        -------
+        List[str]
+            Names of the loaded models.
+        """
+        return [
+            model_name for model_name, model_entry in list(self.session_models.items())
+            if model_entry["model"] is not None
+        ]
+
+
+    def stop(self) -> None:
+        """
+        Stops the background refresh of the models.
         """
-        for model in self._get_list_of_available_models():
-            currency, compare = model.split("_")
-            self._download_files(currency, compare)
-            self._add_model_to_session_models(currency, compare)
+        self._stop_refresh.set()
+        self._executor.shutdown(wait=False)
 
 
-    def _get_models_files_path(self, currency: str, compare: str):
+    def _get_session_model(self, model_name: str) -> OnnxModel:
         """
-        Returns the path to the files in models directory.
+        Gets a model from the session, waiting for it if it is still being loaded.
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the model.
+        
+        Returns
+        -------
+        OnnxModel
+            Model to use for the predictions.
+        """
+        model_entry = self.session_models.get(model_name)
+        if model_entry is None:
+            raise ValueError("Model not found in session.")
+        if model_entry["model"] is None:
+            model_entry["future"].result()
+            model_entry = self.session_models[model_name]
+        return model_entry["model"]
+
+
+    def _submit_model_loading(self, model_name: str) -> Future:
+        """
+        Submits the download and loading of a model to the thread pool, unless the model is 
+        already being loaded.
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the model.
+        
+        Returns
+        -------
+        Future
+            Future of the model loading.
+        """
+        currency, compare = model_name.split("_")
+        with self._session_lock:
+            model_entry = self.session_models.get(model_name)
+            running = model_entry["future"] if model_entry is not None else None
+            if running is not None and not running.done():
+                return running
+            date = self.date
+            future = self._executor.submit(self._download_and_load_model, currency, compare, date)
+            if model_entry is None:
+                self.session_models[model_name] = {"model": None, "future": future, "date": date}
+            else:
+                self.session_models[model_name] = {**model_entry, "future": future}
+        return future
+
+
+    def _download_and_load_model(self, currency: str, compare: str, date: str) -> str:
+        """
+        Downloads the files of a model and adds it to the session.
 
         Parameters
         ----------
@@ -71,15 +223,68 @@ class ModelLoader:
             Currency used in the model.
         compare: str
             Compare used in the model.
+        date: str
+            Date of the model files.
         
         Returns
         -------
         str
-            Path to the model files.
         """
-        model = self.storage_path.joinpath(f"{currency}_{compare}", "model.onnx")
-        scaler = self.storage_path.joinpath(f"{currency}_{compare}", "scaler.pkl")
-        return model, scaler
+        scaler_bytes, metadata = self._download_files(currency, compare, date)
+        return self._add_model_to_session_models(currency, compare, scaler_bytes, metadata, date)
+
+
+    def _refresh_models(self) -> None:
+        """
+        Periodically loads the models that are new, updated for a new date or that failed to load.
+        """
+        while not self._stop_refresh.wait(self.refresh_interval):
+            try:
+                self._refresh_once()
+            except Exception:
+                logger.exception("Refresh of the models failed.")
+
+
+    def _refresh_once(self) -> None:
+        """
+        Loads the models that are new, updated for a new date or that failed to load.
+        """
+        self.update_date()
+        for model_name in self._get_list_of_available_models():
+            model_entry = self.session_models.get(model_name)
+            if model_entry is None:
+                self._submit_model_loading(model_name)
+                continue
+            future = model_entry["future"]
+            if future is not None and not future.done():
+                continue
+            failed = future is not None and future.exception() is not None
+            if failed or model_entry["date"] != self.date:
+                self._submit_model_loading(model_name)
+
+
+    def _get_models_files_path(self, currency: str, compare: str) -> PosixPath:
+        """
+        Returns the path to the model file in models directory.
+
+        Parameters
+        ----------
+        currency: str
+            Currency used in the model.
+        compare: str
+            Compare used in the model.
+        
+        Returns
+        -------
+        PosixPath
+            Path to the model file.
+        """
+        model_name = f"{currency}_{compare}"
+        path = self._models_files_paths.get(model_name)
+        if path is None:
+            path = self.storage_path.joinpath(model_name, self.model_file_name)
+            self._models_files_paths[model_name] = path
+        return path
 
     
     def _makedir(self, currency: str, compare: str) -> None:
@@ -93,47 +298,197 @@ class ModelLoader:
         compare: str
             Compare used in the model.
         """
-        self.storage_path.joinpath(f"{currency}_{compare}").mkdir(exist_ok=True)
+        self.storage_path.joinpath(f"{currency}_{compare}").mkdir(parents=True, exist_ok=True)
 
 
-    def _download_files(self, currency: str, compare: str) -> None:
+    def _download_files(self, currency: str, compare: str, date: str) -> Tuple[bytes, Dict[str, Any]]:
         """
         Downloads model and features engineering files from Minio.
 
+        The model is saved in the models directory while the scaler and the model metadata, 
+        which are small, are kept in memory. If the quantized model is not available, the FP32 
+        model is downloaded instead, and a pickled scaler is used if there is no npz one.
+
         Parameters
         ----------
         currency: str
             Currency used in the model.
         compare: str
             Compare used in the model.
+        date: str
+            Date of the model files.
+        
+        Returns
+        -------
+        Tuple[bytes, Dict[str, Any]]
+            Content of the scaler file and model metadata, None if the model was uploaded 
+            without metadata.
         """
         self._makedir(currency, compare)
-        self.client.download(
-            self.client.bucket,
-            f"{self.date}/{currency}_{compare}/model.onnx",
-            f"{self.storage_path}/{currency}_{compare}/model.onnx"
-        )
-        self.client.download(
-            self.client.bucket,
-            f"{self.date}/{currency}_{compare}/scaler.pkl",
-            f"{self.storage_path}/{currency}_{compare}/scaler.pkl"
+        model_name = f"{currency}_{compare}"
+        model_file_name = self.model_file_name
+        try:
+            self._download_file_if_changed(f"{model_name}/{model_file_name}", date)
+        except S3Error as e:
+            if not self._is_missing_object(e) or model_file_name == "model.onnx":
+                raise
+            model_file_name = "model.onnx"
+            self._download_file_if_changed(f"{model_name}/{model_file_name}", date)
+        self._models_files_paths[model_name] = self.storage_path.joinpath(model_name, model_file_name)
+        try:
+            scaler_bytes = self.client.download_bytes(
+                self.client.bucket, f"{date}/{currency}_{compare}/scaler.npz"
+            )
+        except S3Error as e:
+            if not self._is_missing_object(e):
+                raise
+            scaler_bytes = self._scaler_pickle_to_npz(
+                self.client.download_bytes(self.client.bucket, f"{date}/{currency}_{compare}/scaler.pkl")
+            )
+        try:
+            metadata = json.loads(
+                self.client.download_bytes(self.client.bucket, f"{date}/{currency}_{compare}/meta.json")
+            )
+        except S3Error as e:
+            if not self._is_missing_object(e):
+                raise
+            metadata = None
+        return scaler_bytes, metadata
+
+
+    @staticmethod
+    def _scaler_pickle_to_npz(scaler_pickle: bytes) -> bytes:
+        """
+        Converts a pickled MinMaxScaler to the npz format used by OnnxModel.
+
+        Parameters
+        ----------
+        scaler_pickle: bytes
+            Content of the pickled scaler file.
+        
+        Returns
+        -------
+        bytes
+            Content of the equivalent npz scaler file.
+        """
+        scaler = pickle.loads(scaler_pickle)
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            min_=scaler.min_,
+            scale_=scaler.scale_,
+            data_min_=scaler.data_min_,
+            data_max_=scaler.data_max_,
         )
+        return buffer.getvalue()
 
 
-    def _get_list_of_available_models(self) -> List[str]:
+    @staticmethod
+    def _is_missing_object(error: S3Error) -> bool:
+        """
+        Checks if a Minio error is raised because the requested object does not exist.
+
+        Parameters
+        ----------
+        error: S3Error
+            Error raised by the Minio client.
+        
+        Returns
+        -------
+        bool
+        """
+        return error.code == "NoSuchKey"
+
+
+    def _download_file_if_changed(self, file_key: str, date: str) -> None:
+        """
+        Downloads a file from Minio, unless the local copy has the same etag and size.
+
+        Parameters
+        ----------
+        file_key: str
+            Path of the file relative to the date prefix in the bucket and to the storage path.
+        date: str
+            Date of the file, used as prefix in the bucket.
+        """
+        stat = self.client.stat(self.client.bucket, f"{date}/{file_key}")
+        file_path = self.storage_path.joinpath(file_key)
+        cached = self.files_cache.get(file_key)
+        if (
+            cached is not None 
+            and cached["etag"] == stat.etag 
+            and file_path.exists() 
+            and file_path.stat().st_size == stat.size
+        ):
+            return
+        self.client.download(self.client.bucket, f"{date}/{file_key}", str(file_path))
+        with self._cache_lock:
+            self.files_cache[file_key] = {"etag": stat.etag, "size": stat.size}
+            self._save_files_cache()
+
+
+    def _load_files_cache(self) -> Dict[str, Dict[str, str]]:
+        """
+        Loads the etag and size of the already downloaded files.
+
+        Returns
+        -------
+        Dict[str, Dict[str, str]]
+            Mapping from file key to its etag and size.
+        """
+        if self.cache_path.exists():
+            try:
+                with open(self.cache_path, "r") as file:
+                    return json.load(file)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+
+    def _save_files_cache(self) -> None:
+        """
+        Atomically writes the files cache next to the model files.
+        """
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(self.files_cache, file)
+        os.replace(tmp_path, self.cache_path)
+
+
+    def _get_list_of_available_models(self, force: bool = False) -> FrozenSet[str]:
         """
         Looks for available models in the Minio bucket based on the date.
 
+        The result is cached per date for `available_models_ttl` seconds.
+
+        Parameters
+        ----------
+        force: bool
+            Whether to list the bucket even if the cached list has not expired yet.
+
         Returns
         -------
-        List[str]
-            List of available models.
+        FrozenSet[str]
+            Set of available models.
         """
-        available_models = self.client.list_objects(self.client.bucket, prefix=self.date, recursive=True)
-        return list(set([model.object_name.split("/")[1] for model in available_models]))
+        cached = self._available_models_cache.get(self.date)
+        if (
+            not force 
+            and cached is not None 
+            and time.monotonic() - cached[0] < self.available_models_ttl
+        ):
+            return cached[1]
+        available_models = frozenset(
+            model.object_name.split("/", 2)[1] 
+            for model in self.client.list_objects(self.client.bucket, prefix=self.date, recursive=True)
+        )
+        self._available_models_cache[self.date] = (time.monotonic(), available_models)
+        return available_models
 
     
-    def _add_model_to_session_models(self, currency: str, compare: str) -> str:
+    def _add_model_to_session_models(
+        self, currency: str, compare: str, scaler_bytes: bytes, metadata: Dict[str, Any], date: str,
+    ) -> str:
         """
         Adds a new model to the model session.
 
@@ -143,30 +498,91 @@ class ModelLoader:
             Currency used in the model.
         compare: str
             Compare used in the model.
+        scaler_bytes: bytes
+            Content of the scaler file.
+        metadata: Dict[str, Any]
+            Input and output names and shape of the model, None to read them from the session.
+        date: str
+            Date of the model files.
         
         Returns
         -------
         str
         """
-        model_path, scaler_path = self._get_models_files_path(currency, compare)
-        model = OnnxModel(model_path=model_path, scaler_path=scaler_path)
-        self.session_models[f"{currency}_{compare}"] = {"model": model}
+        model_path = self._get_models_files_path(currency, compare)
+        session_model_path, session_options = self._create_session_options(model_path)
+        model = OnnxModel(
+            model_path=session_model_path, 
+            scaler_bytes=scaler_bytes, 
+            metadata=metadata,
+            session_options=session_options, 
+            providers=self._get_providers(),
+        )
+        try:
+            model.warmup()
+        except Exception:
+            logger.exception(f"Warm-up of {model} failed.")
+        with self._session_lock:
+            self.session_models[f"{currency}_{compare}"] = {
+                "model": model, 
+                "input_shape": model.input_shape,
+                "model_path": str(model_path),
+                "scaler_bytes": scaler_bytes,
+                "future": None,
+                "date": date,
+            }
         return f"Model {model} added to session."
 
 
-    def _check_model_exists_in_session(self, model_name: str) -> bool:
+    def _create_session_options(
+        self, model_path: PosixPath
+    ) -> Tuple[PosixPath, onnxruntime.SessionOptions]:
         """
-        Checks if the model exists in the current session.
+        Creates the ONNX Runtime session options for a model.
+
+        The graph optimized by ONNX Runtime is saved next to the model, so it is loaded directly 
+        the next time as long as the model file has not been updated in the meantime. Graph 
+        optimizations are disabled when loading it, since they have already been applied.
 
         Parameters
         ----------
-        model_name: str
-            Name of the model.
+        model_path: PosixPath
+            Path to the model file.
         
         Returns
         -------
-        bool
+        Tuple[PosixPath, onnxruntime.SessionOptions]
+            Path to the model file to load and the session options.
         """
-        if model_name in self.session_models.keys():
-            return True
-        return False
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // 2)
+        options.enable_mem_pattern = True
+        optimized_model_path = model_path.with_suffix(".opt.onnx")
+        if (
+            optimized_model_path.exists() 
+            and optimized_model_path.stat().st_mtime >= model_path.stat().st_mtime
+        ):
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
+            return optimized_model_path, options
+        options.optimized_model_filepath = str(optimized_model_path)
+        return model_path, options
+
+
+    @staticmethod
+    def _get_providers() -> List[str]:
+        """
+        Returns the execution providers to use, CUDA first if available.
+
+        Returns
+        -------
+        List[str]
+            List of execution providers.
+        """
+        available_providers = onnxruntime.get_available_providers()
+        return [
+            provider for provider in ["CUDAExecutionProvider", "CPUExecutionProvider"] 
+            if provider in available_providers
+        ]
+
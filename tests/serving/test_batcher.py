@@ -0,0 +1,52 @@
+import asyncio
+import pandas as pd
+
+from make_us_rich.serving import PredictionBatcher
+
+
+class FakeLoader:
+    """ModelLoader stub predicting the length of the samples, which fails on mismatched batches."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+
+    def get_predictions(self, model_name, sample):
+        return float(len(sample))
+
+
+    def get_predictions_batch(self, model_name, samples):
+        if len({len(sample) for sample in samples}) > 1:
+            raise ValueError("all input arrays must have the same shape")
+        self.batch_sizes.append(len(samples))
+        return [float(len(sample)) for sample in samples]
+
+
+def _sample(length):
+    return pd.DataFrame({"close": range(length)})
+
+
+def test_concurrent_requests_are_batched():
+    loader = FakeLoader()
+
+    async def run():
+        batcher = PredictionBatcher(loader)
+        return await asyncio.gather(*[batcher.predict("btc_usdt", _sample(5)) for _ in range(3)])
+
+    assert asyncio.run(run()) == [5.0, 5.0, 5.0]
+    assert loader.batch_sizes == [3]
+
+
+def test_mismatched_sample_does_not_fail_the_batch():
+    loader = FakeLoader()
+
+    async def run():
+        batcher = PredictionBatcher(loader)
+        return await asyncio.gather(
+            batcher.predict("btc_usdt", _sample(5)),
+            batcher.predict("btc_usdt", _sample(3)),
+            batcher.predict("btc_usdt", _sample(5)),
+        )
+
+    assert asyncio.run(run()) == [5.0, 3.0, 5.0]
+    assert loader.batch_sizes == [2]
@@ -0,0 +1,156 @@
+import numpy as np
+import onnx
+import pandas as pd
+import pickle
+import pytest
+
+from onnx import TensorProto, helper, numpy_helper
+from sklearn.preprocessing import MinMaxScaler
+
+from make_us_rich.pipelines.preprocessing import extract_features_from_dataset
+from make_us_rich.serving import ModelLoader, OnnxModel
+
+
+SEQUENCE_LENGTH = 5
+NUMBER_OF_FEATURES = 9
+WEIGHTS = np.linspace(-1, 1, NUMBER_OF_FEATURES, dtype=np.float32).reshape(-1, 1)
+
+
+def _market_data(length, start=0):
+    timestamps = pd.date_range("2022-01-01", periods=length, freq="h")
+    prices = np.arange(start, start + length, dtype=np.float64) + 100
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "open": prices,
+        "high": prices + 2,
+        "low": prices - 2,
+        "close": prices + 1,
+    })
+
+
+@pytest.fixture
+def scaler():
+    return MinMaxScaler(feature_range=(-1, 1)).fit(extract_features_from_dataset(_market_data(48)))
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    """Sums the sequence over time and projects it on fixed weights: output = sum(X, 1) @ W."""
+    graph = helper.make_graph(
+        [
+            helper.make_node("ReduceSum", ["sequence"], ["summed"], axes=[1], keepdims=0),
+            helper.make_node("MatMul", ["summed", "weights"], ["output"]),
+        ],
+        "sum_and_project",
+        [helper.make_tensor_value_info(
+            "sequence", TensorProto.FLOAT, ["batch_size", SEQUENCE_LENGTH, NUMBER_OF_FEATURES]
+        )],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, ["batch_size", 1])],
+        [numpy_helper.from_array(WEIGHTS, name="weights")],
+    )
+    model = helper.make_model(graph, ir_version=7, opset_imports=[helper.make_opsetid("", 11)])
+    onnx.checker.check_model(model)
+    path = tmp_path.joinpath("btc_usdt", "model.onnx")
+    path.parent.mkdir()
+    onnx.save(model, str(path))
+    return path
+
+
+@pytest.fixture
+def scaler_path(model_path, scaler):
+    path = model_path.parent.joinpath("scaler.npz")
+    np.savez(
+        path,
+        min_=scaler.min_,
+        scale_=scaler.scale_,
+        data_min_=scaler.data_min_,
+        data_max_=scaler.data_max_,
+    )
+    return path
+
+
+@pytest.fixture
+def model(model_path, scaler_path):
+    return OnnxModel(model_path=model_path, scaler_path=scaler_path)
+
+
+def _expected_prediction(scaler, sample):
+    scaled = scaler.transform(extract_features_from_dataset(sample))
+    output = scaled.sum(axis=0) @ WEIGHTS[:, 0]
+    return (output - scaler.min_[-1]) / scaler.scale_[-1]
+
+
+def test_scaling_matches_min_max_scaler(model, scaler):
+    sample = _market_data(SEQUENCE_LENGTH, start=7)
+    scaled = model._scaling_sample(sample)
+    np.testing.assert_allclose(
+        scaled, scaler.transform(extract_features_from_dataset(sample)), rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        model._descaling_sample(scaled[:, -1]), scaler.inverse_transform(scaled)[:, -1], rtol=1e-6
+    )
+
+
+def test_pickled_scaler_is_converted(model_path, scaler):
+    scaler_path = model_path.parent.joinpath("scaler.npz")
+    scaler_path.write_bytes(ModelLoader._scaler_pickle_to_npz(pickle.dumps(scaler)))
+    model = OnnxModel(model_path=model_path, scaler_path=scaler_path)
+    for key in ["min_", "scale_", "data_min_", "data_max_"]:
+        np.testing.assert_array_equal(model.scaler[key], getattr(scaler, key))
+
+
+def test_shapes_are_read_from_the_session(model):
+    assert model.input_name == "sequence"
+    assert model.output_name == "output"
+    assert model.input_shape == (1, SEQUENCE_LENGTH, NUMBER_OF_FEATURES)
+    assert model.input_dtype == np.float32
+    assert model.output_shape == (1, 1)
+
+
+def test_metadata_is_used_when_given(model_path, scaler_path):
+    metadata = {
+        "input_name": "sequence",
+        "input_shape": ["batch_size", SEQUENCE_LENGTH, NUMBER_OF_FEATURES],
+        "input_dtype": "float32",
+        "output_name": "output",
+    }
+    model = OnnxModel(model_path=model_path, scaler_path=scaler_path, metadata=metadata)
+    assert model.input_shape == (1, SEQUENCE_LENGTH, NUMBER_OF_FEATURES)
+    assert model._input_buffer.dtype == np.float32
+
+
+def test_predict_runs_the_model(model, scaler):
+    sample = _market_data(SEQUENCE_LENGTH, start=3)
+    prediction = model.predict(sample)
+    np.testing.assert_allclose(prediction, _expected_prediction(scaler, sample), rtol=1e-4)
+
+
+def test_output_buffer_is_reallocated_when_the_batch_size_changes(model):
+    inputs = np.random.default_rng(0).normal(size=(3, SEQUENCE_LENGTH, NUMBER_OF_FEATURES))
+    model.warmup()
+    assert tuple(model._output_buffer.shape()) == (1, 1)
+
+    with model._lock:
+        outputs = model._run(inputs)
+    assert tuple(model._output_buffer.shape()) == (3, 1)
+    np.testing.assert_allclose(outputs, inputs.sum(axis=1) @ WEIGHTS, rtol=1e-4, atol=1e-5)
+
+    model.warmup()
+    assert tuple(model._output_buffer.shape()) == (1, 1)
+
+
+def test_predict_batch_reallocates_the_output_buffer(model, scaler):
+    samples = [_market_data(SEQUENCE_LENGTH, start=start) for start in range(3)]
+    model.predict(samples[0])
+    assert tuple(model._output_buffer.shape()) == (1, 1)
+
+    predictions = model.predict_batch(samples)
+    assert tuple(model._output_buffer.shape()) == (3, 1)
+    np.testing.assert_allclose(
+        predictions, [_expected_prediction(scaler, sample) for sample in samples], rtol=1e-4
+    )
+
+    np.testing.assert_allclose(
+        model.predict(samples[1]), _expected_prediction(scaler, samples[1]), rtol=1e-4
+    )
+    assert tuple(model._output_buffer.shape()) == (1, 1)
@@ -0,0 +1,176 @@
+import json
+import pytest
+
+from threading import Event, Lock
+from types import SimpleNamespace
+
+from make_us_rich.serving import model_loader as model_loader_module
+from make_us_rich.serving import ModelLoader
+
+
+MODEL_NAME = "btc_usdt"
+
+
+class FakeMinioClient:
+    """Minio client serving a single model, whose model file downloads can be gated or fail."""
+
+    bucket = "models"
+
+    def __init__(self):
+        self.gate = Event()
+        self.gate.set()
+        self.failures = 0
+        self.model_downloads = 0
+        self.list_calls = 0
+        self._lock = Lock()
+
+
+    def list_objects(self, bucket, prefix=None, recursive=False):
+        self.list_calls += 1
+        return [
+            SimpleNamespace(object_name=f"{prefix}/{MODEL_NAME}/{file_name}")
+            for file_name in ["model.int8.onnx", "scaler.npz", "meta.json"]
+        ]
+
+
+    def stat(self, bucket, object_name):
+        return SimpleNamespace(etag="etag", size=len(b"model"))
+
+
+    def download(self, bucket, object_name, file_path):
+        self.gate.wait(timeout=5)
+        with self._lock:
+            self.model_downloads += 1
+            if self.failures > 0:
+                self.failures -= 1
+                raise ConnectionError("Minio is unreachable.")
+        with open(file_path, "wb") as file:
+            file.write(b"model")
+
+
+    def download_bytes(self, bucket, object_name):
+        if object_name.endswith("meta.json"):
+            return json.dumps(
+                {"input_name": "sequence", "input_shape": ["batch_size", 5, 9], "output_name": "output"}
+            ).encode()
+        return b"scaler"
+
+
+class FakeOnnxModel:
+    """OnnxModel stub predicting the length of the sample."""
+
+    def __init__(self, model_path, **kwargs):
+        self.model_path = model_path
+        self.input_shape = (1, 5, 9)
+
+
+    def warmup(self):
+        pass
+
+
+    def predict(self, sample):
+        return float(len(sample))
+
+
+    def predict_batch(self, samples):
+        return [float(len(sample)) for sample in samples]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeMinioClient()
+    monkeypatch.setattr(model_loader_module, "MinioClient", lambda: client)
+    monkeypatch.setattr(model_loader_module, "OnnxModel", FakeOnnxModel)
+    return client
+
+
+@pytest.fixture
+def make_loader(client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    loaders = []
+
+    def _make_loader():
+        loader = ModelLoader(refresh_interval=3600)
+        loaders.append(loader)
+        return loader
+
+    yield _make_loader
+    for loader in loaders:
+        loader.stop()
+
+
+def _wait_for_model(loader):
+    future = loader.session_models[MODEL_NAME]["future"]
+    if future is not None:
+        future.result()
+
+
+def test_loading_model_is_served_once_loaded(client, make_loader):
+    client.gate.clear()
+    loader = make_loader()
+    assert loader.session_models[MODEL_NAME]["model"] is None
+    assert loader.get_loaded_models() == []
+
+    client.gate.set()
+    assert loader.get_predictions(MODEL_NAME, [1, 2, 3]) == 3.0
+    assert loader.get_loaded_models() == [MODEL_NAME]
+
+
+def test_unknown_model_raises(client, make_loader):
+    loader = make_loader()
+    with pytest.raises(ValueError):
+        loader.get_predictions("eth_usdt", [1])
+
+
+def test_failed_load_is_retried_on_refresh(client, make_loader):
+    client.failures = 1
+    loader = make_loader()
+    with pytest.raises(ConnectionError):
+        _wait_for_model(loader)
+
+    loader._refresh_once()
+    _wait_for_model(loader)
+    assert loader.get_predictions(MODEL_NAME, [1, 2]) == 2.0
+
+
+def test_update_model_files_raises_failed_loads(client, make_loader):
+    loader = make_loader()
+    _wait_for_model(loader)
+    client.failures = 1
+    loader.files_cache.clear()
+    with pytest.raises(ConnectionError):
+        loader.update_model_files()
+
+
+def test_no_duplicate_load_while_loading(client, make_loader):
+    client.gate.clear()
+    loader = make_loader()
+    first_future = loader.session_models[MODEL_NAME]["future"]
+    loader.update_model_files(wait_for_models=False)
+    loader._refresh_once()
+    assert loader.session_models[MODEL_NAME]["future"] is first_future
+
+    client.gate.set()
+    first_future.result()
+    assert client.model_downloads == 1
+
+
+def test_unchanged_model_is_not_downloaded_again(client, make_loader):
+    loader = make_loader()
+    _wait_for_model(loader)
+    loader.update_model_files()
+    assert client.model_downloads == 1
+
+    cache = json.loads(loader.cache_path.read_text())
+    assert cache == {f"{MODEL_NAME}/model.int8.onnx": {"etag": "etag", "size": len(b"model")}}
+
+
+def test_update_model_files_lists_the_bucket_again(client, make_loader):
+    loader = make_loader()
+    _wait_for_model(loader)
+    assert client.list_calls == 1
+
+    loader._get_list_of_available_models()
+    assert client.list_calls == 1
+    loader.update_model_files()
+    assert client.list_calls == 2